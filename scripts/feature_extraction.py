@@ -1,4 +1,4 @@
-import datetime, time, bisect, math, numpy as np
+import datetime, time, numpy as np
 
 
 """
@@ -45,14 +45,17 @@ class Traceroute:
         self.resLifetime = -1
 
         self.timestamp = None
-        self.timeslotIndex = 0
+
+        # one entry per timeslot duration the observation time is subdivided with
+        self.timeslotIndex = list()
 
         self.lastHop = TracerouteHop()      # last hop of traceroute
         self.nextLastHop = TracerouteHop()  # last hop of the next traceroute sample
 
-        self.currentNbChangesInSlot = None
-        self.nbRouteChangesInSlot = -1
-        self.nbRouteChangesInNextSlot = -1
+        # one entry per timeslot duration the observation time is subdivided with
+        self.currentNbChangesInSlot = list()
+        self.nbRouteChangesInSlot = list()
+        self.nbRouteChangesInNextSlot = list()
 
         self.srcIP = None
         self.dstIP = None
@@ -169,27 +172,30 @@ def __getUnixTimestamp(dateString):
 
 
 """
-Get the index of the timeslot in <timeslotsLowerBounds> to which the route observed at time <timestamp> belongs to. A
-timeslot in the array <timeslotsLowerBounds> is represented with its lower bound.  For instance, the entry for the
-timeslot (0, 12) in the array is simply 0.
+Get the duration <duration> given in hours (possibly a fraction of an hour) as a whole number of seconds, so that timeslots
+can be computed with integer arithmetic only. A duration is at least one second long.
 """
-def __getTimeslotIndex(timeslotsLowerBounds, timestamp):
-    return bisect.bisect_right(timeslotsLowerBounds, timestamp) - 1
+def __getDurationInSeconds(duration):
+    return max(int(round(duration * 60 * 60)), 1)
 
 
 """
-Get the timeslots by which you want to separate your observation (learning) time (in hours). <timestamp> indicates the time (in
-the unix-timestamp format) at which the observation time starts, <timeslotDuration> the duration (in hours) of one
-timeslot, and <observationDuration> represents the duration of the observation time.
-The timeslots are returned in the form of an array; each timeslot is represented by a tuple (<lb>, <ub>). <lb> is the lower
-bound of this timeslot and <ub> is the upper bound.
+Get the index of the timeslot to which the route observed <elapsedSeconds> seconds after the start of the observation time
+belongs to. <timeslotSeconds> indicates the duration (in seconds) of one timeslot and <numberOfTimeslots> the number of
+timeslots of the observation time.
+The index is computed arithmetically; routes observed after the end of the last timeslot are assigned to this last timeslot.
 """
-def __getTimeslots(timestamp, timeslotDuration, observationDuration):
-    numberOfTimeslotsBoundaries = int(math.ceil(observationDuration / timeslotDuration) + 1)
-    timeslotBoundaries = [timestamp + i * 60 * 60 * timeslotDuration for i in range(0, numberOfTimeslotsBoundaries)]
-    timeslots = [tuple([timeslotBoundaries[i], timeslotBoundaries[i + 1]]) for i in
-                 range(0, numberOfTimeslotsBoundaries - 1)]
-    return timeslots
+def __getTimeslotIndex(elapsedSeconds, timeslotSeconds, numberOfTimeslots):
+    return min(max(elapsedSeconds // timeslotSeconds, 0), numberOfTimeslots - 1)
+
+
+"""
+Get the number of timeslots by which you want to separate your observation (learning) time. <timeslotSeconds> indicates the
+duration (in seconds) of one timeslot and <observationSeconds> the duration (in seconds) of the observation time.
+The observation time always spans at least one timeslot.
+"""
+def __getNumberOfTimeslots(timeslotSeconds, observationSeconds):
+    return max((observationSeconds + timeslotSeconds - 1) // timeslotSeconds, 1)
 
 
 """
@@ -254,25 +260,26 @@ def __collectResidualLifetimeFeatures(traceroute, routeDuration):
 
 """
 Get all the features for the traceroute sample ``traceroute`` required for predicting the number of route changes in the next
-timeslot in the form of a string.
+timeslot in the form of a string. <granularity> is the index of the timeslot duration for which the features are collected.
 The format of the string is str(``numberOfRouteChanges``) <tab> total number of route changes in this timeslot <tab>
 1 if there are route changes in this slot, 0 otherwise <tab> number of currently observed route changes in ``traceroute``'s timeslot
 <tab> number of route changes in the next timeslot
 str(``numberOfRouteChanges``) refers to the string representation of a ``NumberOfRouteChangesStatistics`` instance.
 """
-def __collectStringNumberRouteChangesFeatures(traceroute, numberOfRouteChanges):
-    return str(numberOfRouteChanges) + '\t' + str(traceroute.nbRouteChangesInSlot) + '\t' \
-            + ('1' if traceroute.nbRouteChangesInSlot > 0 else '0') + '\t' \
-            + str(traceroute.currentNbChangesInSlot) + '\t' + str(traceroute.nbRouteChangesInNextSlot)
+def __collectStringNumberRouteChangesFeatures(traceroute, numberOfRouteChanges, granularity):
+    return str(numberOfRouteChanges) + '\t' + str(traceroute.nbRouteChangesInSlot[granularity]) + '\t' \
+            + ('1' if traceroute.nbRouteChangesInSlot[granularity] > 0 else '0') + '\t' \
+            + str(traceroute.currentNbChangesInSlot[granularity]) + '\t' \
+            + str(traceroute.nbRouteChangesInNextSlot[granularity])
 
 
 # TODO
-def __collectNumberRouteChangesFeatures(traceroute, numberOfRouteChanges):
+def __collectNumberRouteChangesFeatures(traceroute, numberOfRouteChanges, granularity):
     return [numberOfRouteChanges.totalNumberOfRouteChanges, numberOfRouteChanges.numberOfRouteChangesInTimeslotsAverage,
             numberOfRouteChanges.numberOfRouteChangesInTimeslotsMinimum, numberOfRouteChanges.numberOfRouteChangesInTimeslotsMaximum] \
             + list(numberOfRouteChanges.numberOfRouteChangesInTimeslotsPercentiles) + \
-           [traceroute.nbRouteChangesInSlot, 1 if traceroute.nbRouteChangesInSlot > 0 else 0,
-            traceroute.currentNbChangesInSlot, traceroute.nbRouteChangesInNextSlot]
+           [traceroute.nbRouteChangesInSlot[granularity], 1 if traceroute.nbRouteChangesInSlot[granularity] > 0 else 0,
+            traceroute.currentNbChangesInSlot[granularity], traceroute.nbRouteChangesInNextSlot[granularity]]
 
 
 """
@@ -293,14 +300,20 @@ def __collectAvgRTTFeatures(traceroute, avgRTT):
 
 
 # TODO
+# the features for the number of route changes are collected for each timeslot duration, <numberRouteChangesStats> holding
+# one NumberOfRouteChangesStatistics-object per duration; the samples of each duration are filtered independently of the
+# other durations, while the samples for the residual lifetime and the average RTT must also be valid for the first duration
+# (as they are when running with this duration only)
 def __collectAllFeatures(traceroutes, routeDurationStats, numberRouteChangesStats, avgRTTStats, inTraining):
+    granularities = range(0, len(numberRouteChangesStats))
+
     resLifeInputFeatures = list()
-    routeChangesInputFeatures = list()
+    routeChangesInputFeatures = [list() for granularity in granularities]
     avgRTTInputFeatures = list()
 
     if inTraining:
         resLifeRealValues = list()
-        routeChangesRealValues = list()
+        routeChangesRealValues = [list() for granularity in granularities]
         avgRTTRealValues = list()
 
     invalidValues = [None, -1]
@@ -312,24 +325,34 @@ def __collectAllFeatures(traceroutes, routeDurationStats, numberRouteChangesStat
             (not inTraining and any(i in resLifeFeatures[:-1] for i in invalidValues)):
             continue
 
-        routeChangesFeatures = __collectNumberRouteChangesFeatures(traceroute, numberRouteChangesStats)
-        if (inTraining and any(i in routeChangesFeatures for i in invalidValues)) or \
-            (not inTraining and any(i in routeChangesFeatures[:-1] for i in invalidValues)):
-            continue
-
         avgRTTFeatures = __collectAvgRTTFeatures(traceroute, avgRTTStats)
         if (inTraining and any(i in avgRTTFeatures for i in invalidValues)) or \
                 (not inTraining and any(i in avgRTTFeatures[:-1] for i in invalidValues)):
             continue
 
+        # the features for the number of route changes are only kept for the timeslot durations for which they are valid
+        validRouteChangesFeatures = list()
+        for granularity in granularities:
+            routeChangesFeatures = __collectNumberRouteChangesFeatures(traceroute, numberRouteChangesStats[granularity],
+                                                                       granularity)
+            validRouteChangesFeatures.append(not ((inTraining and any(i in routeChangesFeatures for i in invalidValues)) or
+                                                  (not inTraining and any(i in routeChangesFeatures[:-1] for i in invalidValues))))
+            if not validRouteChangesFeatures[granularity]:
+                continue
+
+            routeChangesInputFeatures[granularity].append(routeChangesFeatures[:-1])
+            if inTraining:
+                routeChangesRealValues[granularity].append(routeChangesFeatures[-1])
+
+        if not validRouteChangesFeatures[0]:
+            continue
+
         # get features fed into the ML model
         resLifeInputFeatures.append(resLifeFeatures[:-1])
-        routeChangesInputFeatures.append(routeChangesFeatures[:-1])
         avgRTTInputFeatures.append(avgRTTFeatures[:-1])
 
         if inTraining:
             resLifeRealValues.append(resLifeFeatures[-1])
-            routeChangesRealValues.append(routeChangesFeatures[-1])
             avgRTTRealValues.append(avgRTTFeatures[-1])
 
     if inTraining:
@@ -346,7 +369,10 @@ be located in the log folder and the naming scheme of it is: '<timestamp>_featur
 is the time at which this function has been executed, <srcIP> the source IP of the monitored path, and <dstIP> the
 destination IP of it.
 One line corresponds to the features for one traceroute sample.
-The (tab separated) format of a line is: <resLifeFeatures> <tab> <routeChangesFeatures> <tab> <minRTTFeatures>.
+The (tab separated) format of a line is: <resLifeFeatures> <tab> <routeChangesFeatures> <tab> <minRTTFeatures>, where
+<routeChangesFeatures> holds the (tab separated) features for each timeslot duration, in the order of <numberRouteChangesStats>.
+A traceroute whose next timeslot is unknown for the first duration is not dumped; for any other duration, it is dumped with
+-1 as number of route changes in the next timeslot.
 These features are the results of the functions __collectStringResidualLifetimeFeatures(), __collectStringNumberRouteChangesFeatures(),
 and __collectStringAvgRTTFeatures().
 """
@@ -366,8 +392,11 @@ def __saveFeaturesInFile(traceroutes, routeDurationStats, numberRouteChangesStat
                 resLifeFeatures = __collectResidualLifetimeFeatures(traceroute, routeDurationStats)
                 if any(i in resLifeFeatures for i in invalidValues):
                     continue
-                routeChangesFeatures = __collectNumberRouteChangesFeatures(traceroute, numberRouteChangesStats)
-                if any(i in routeChangesFeatures for i in invalidValues):
+                routeChangesFeatures = [__collectNumberRouteChangesFeatures(traceroute, numberRouteChangesStats[granularity],
+                                                                            granularity)
+                                        for granularity in range(0, len(numberRouteChangesStats))]
+                if any(i in routeChangesFeatures[0] for i in invalidValues) or \
+                        any(i in features[:-1] for features in routeChangesFeatures[1:] for i in invalidValues):
                     continue
                 avgRTTfeatures = __collectAvgRTTFeatures(traceroute, avgRTTStats)
                 if any(i in avgRTTfeatures for i in invalidValues):
@@ -375,7 +404,10 @@ def __saveFeaturesInFile(traceroutes, routeDurationStats, numberRouteChangesStat
 
                 # save to log file
                 resLifeFeaturesString = __collectStringResidualLifetimeFeatures(traceroute, routeDurationStats)
-                routeChangesFeaturesString = __collectStringNumberRouteChangesFeatures(traceroute, numberRouteChangesStats)
+                routeChangesFeaturesString = '\t'.join([__collectStringNumberRouteChangesFeatures(traceroute,
+                                                                                                   numberRouteChangesStats[granularity],
+                                                                                                   granularity)
+                                                         for granularity in range(0, len(numberRouteChangesStats))])
                 minRTTFeaturesString = __collectStringAvgRTTFeatures(traceroute, avgRTTStats)
 
                 out.write(str(resLifeFeaturesString) + '\t' + str(routeChangesFeaturesString) + '\t' + str(minRTTFeaturesString + '\n'))
@@ -386,7 +418,9 @@ def __saveFeaturesInFile(traceroutes, routeDurationStats, numberRouteChangesStat
 
 
 # TODO
-def getFeatures(path, filename, observationDuration, timeslotDuration, inTraining):
+# <timeslotDurations> is the list of the durations (in hours) of the timeslots; the features and real values for the number
+# of route changes are returned as one list per duration, all of them being computed while parsing the file only once
+def getFeatures(path, filename, observationDuration, timeslotDurations, inTraining):
     with open(path + filename, 'r') as inputFile:
         diffTraceroutes = list()  # observed traceroutes without sequential repetition; example: A A B A is stored as A B A)
         traceroutes     = list()  # all obsserved traceroutes
@@ -395,9 +429,16 @@ def getFeatures(path, filename, observationDuration, timeslotDuration, inTrainin
 
         currentTraceroute = Traceroute()
 
-        # each index corresponds to a timeslotIndex which points to a list of traceroutes corresponding to that timeslot
-        # same traceroute-storing principle as for <difftraceroutes>
-        routesInSlots = list()
+        granularities = range(0, len(timeslotDurations))
+        timeslotsSeconds = [__getDurationInSeconds(timeslotDuration) for timeslotDuration in timeslotDurations]
+        observationSeconds = __getDurationInSeconds(observationDuration)
+        numberOfTimeslots = [__getNumberOfTimeslots(timeslotSeconds, observationSeconds) for timeslotSeconds in timeslotsSeconds]
+
+        # for each timeslot duration, each index corresponds to a timeslotIndex which points to the number of different
+        # traceroutes observed in that timeslot and to the last one of them
+        # same traceroute-counting principle as for <difftraceroutes>
+        nbRoutesInSlots = [[0] * numberOfTimeslots[granularity] for granularity in granularities]
+        lastRoutesInSlots = [[None] * numberOfTimeslots[granularity] for granularity in granularities]
 
         print "Start parsing file '" + filename + "' and extracting features..."
         for line in inputFile:
@@ -418,16 +459,9 @@ def getFeatures(path, filename, observationDuration, timeslotDuration, inTrainin
                     unixTimestamp = __getUnixTimestamp(data[1])
 
                     if not timestampMeasurementsBegin:   # first traceroute in file
+                        # each traceroute sample will be assigned to its corresponding timeslots relatively to this
+                        # timestamp so that we can compute the number of route changes in each slot later
                         timestampMeasurementsBegin = unixTimestamp
-                        # prepare the different timeslots: each traceroute sample will be assigned to its corresponding
-                        # timeslot so that we can compute the number of route changes in each slot later
-                        timeslots = __getTimeslots(unixTimestamp, timeslotDuration, observationDuration)
-                        timeslotsLowerBounds = [ts[0] for ts in timeslots]  # get lower bounds of different timeslots
-
-                        # initiate the list for each timeslot (the lists will later contain the traceroutes associated to
-                        # the different timeslots
-                        for i in range(1, len(timeslots) + 1):
-                            routesInSlots.append(list())
 
                     currentTraceroute.timestamp = unixTimestamp
 
@@ -449,22 +483,25 @@ def getFeatures(path, filename, observationDuration, timeslotDuration, inTrainin
 
                 # all information about one traceroute has been collected - wrap up with this one
                 elif data[0] == 'END':
-                    # add this traceroute to its corresponding timeslot
-                    timeslotIndex = __getTimeslotIndex(timeslotsLowerBounds, currentTraceroute.timestamp)
-                    currentTraceroute.timeslotIndex = timeslotIndex
-
                     # if applicable, add this traceroute to the list of different traceroutes
                     if len(diffTraceroutes) == 0 or currentTraceroute != diffTraceroutes[-1]:
                         diffTraceroutes.append(currentTraceroute)
 
-                    # if applicable, add this traceroute to the list of traceroutes of its corresponding timeslot
-                    if len(routesInSlots[currentTraceroute.timeslotIndex]) == 0 \
-                            or currentTraceroute != routesInSlots[currentTraceroute.timeslotIndex][-1]:
-                        routesInSlots[currentTraceroute.timeslotIndex].append(currentTraceroute)
+                    elapsedSeconds = int(round(currentTraceroute.timestamp - timestampMeasurementsBegin))
+                    for granularity in granularities:
+                        # add this traceroute to its corresponding timeslot
+                        timeslotIndex = __getTimeslotIndex(elapsedSeconds, timeslotsSeconds[granularity],
+                                                           numberOfTimeslots[granularity])
+                        currentTraceroute.timeslotIndex.append(timeslotIndex)
+
+                        # if applicable, count this traceroute as a different traceroute of its corresponding timeslot
+                        if nbRoutesInSlots[granularity][timeslotIndex] == 0 \
+                                or currentTraceroute != lastRoutesInSlots[granularity][timeslotIndex]:
+                            nbRoutesInSlots[granularity][timeslotIndex] += 1
+                            lastRoutesInSlots[granularity][timeslotIndex] = currentTraceroute
 
-                    # record for this traceroute the number of route changes so far observed in its timeslot
-                    currentTraceroute.currentNbChangesInSlot = len(routesInSlots[currentTraceroute.timeslotIndex]) - 1 \
-                                                            if len(routesInSlots[currentTraceroute.timeslotIndex]) - 1 else 0
+                        # record for this traceroute the number of route changes so far observed in its timeslot
+                        currentTraceroute.currentNbChangesInSlot.append(nbRoutesInSlots[granularity][timeslotIndex] - 1)
 
                     # save this traceroute sample
                     traceroutes.append(currentTraceroute)
@@ -523,13 +560,16 @@ def getFeatures(path, filename, observationDuration, timeslotDuration, inTrainin
         routeDurations_np = np.array(routeDurations)  # create numpy array
         routeDurationStats = __getStatistics(routeDurations_np, 'res')
 
-        # compute stats about route changes in timeslots
-        nbRouteChangesInTimeslots = [len(routes) - 1 if len(routes) > 0 else 0 for routes in routesInSlots]
-        nbRouteChangesInTimeslots_np = np.array(nbRouteChangesInTimeslots)
-        nbRouteChangesStats = __getStatistics(nbRouteChangesInTimeslots_np, 'rc')
+        # compute stats about route changes in timeslots, for each timeslot duration
+        nbRouteChangesInTimeslots = [[nbRoutes - 1 if nbRoutes > 0 else 0 for nbRoutes in nbRoutesInSlots[granularity]]
+                                     for granularity in granularities]
+        nbRouteChangesStats = list()
+        for granularity in granularities:
+            nbRouteChangesInTimeslots_np = np.array(nbRouteChangesInTimeslots[granularity])
+            nbRouteChangesStats.append(__getStatistics(nbRouteChangesInTimeslots_np, 'rc'))
 
-        # for the number of route changes, add also the total number of changes observed during the observation time
-        nbRouteChangesStats.totalNumberOfRouteChanges = nbRouteChanges
+            # for the number of route changes, add also the total number of changes observed during the observation time
+            nbRouteChangesStats[granularity].totalNumberOfRouteChanges = nbRouteChanges
 
         # compute stats about observed minimum RTTs
         # minRTTs_np = np.array(minRTTs)  # create numpy array
@@ -542,9 +582,13 @@ def getFeatures(path, filename, observationDuration, timeslotDuration, inTrainin
         # for each traceroute, compute the number of route changes in its timeslot, and, if applicable, the number of
         # route changes in the next timeslot
         for traceroute in traceroutes:
-            traceroute.nbRouteChangesInSlot = nbRouteChangesInTimeslots[traceroute.timeslotIndex]
-            if traceroute.timeslotIndex < len(nbRouteChangesInTimeslots) - 1:
-                traceroute.nbRouteChangesInNextSlot = nbRouteChangesInTimeslots[traceroute.timeslotIndex + 1]
+            for granularity in granularities:
+                timeslotIndex = traceroute.timeslotIndex[granularity]
+                traceroute.nbRouteChangesInSlot.append(nbRouteChangesInTimeslots[granularity][timeslotIndex])
+                if timeslotIndex < numberOfTimeslots[granularity] - 1:
+                    traceroute.nbRouteChangesInNextSlot.append(nbRouteChangesInTimeslots[granularity][timeslotIndex + 1])
+                else:
+                    traceroute.nbRouteChangesInNextSlot.append(-1)
 
         if inTraining:
             # save computed features for the traceroute samples in ``traceroutes`` to a file
@@ -12,28 +12,39 @@ if __name__ == '__main__':
     parser.add_argument('-o', action="store", dest="observationTime", help="Duration in hours of the observation time; "
                                                                            "i.e. the time spanned by the samples used "
                                                                            "as observation (training) data.",
-                                                                            type=int,
-                                                                            required=True)
-    parser.add_argument('-t', action="store", dest="timeslotDuration", help="Duration in hours of a timeslot; "
-                                                                            "i.e. the duration of the time windows in which "
-                                                                            "the observation period will be subdivided.",
-                                                                            type=int,
+                                                                            type=float,
                                                                             required=True)
+    parser.add_argument('-t', action="store", dest="timeslotDurations", help="Duration(s) in hours of a timeslot; "
+                                                                             "i.e. the duration of the time windows in which "
+                                                                             "the observation period will be subdivided. "
+                                                                             "Several durations yield one forecast each.",
+                                                                             type=float,
+                                                                             nargs='+',
+                                                                             required=True)
 
     arguments = vars(parser.parse_args())
-    if arguments['observationTime'] <= 0 or arguments['timeslotDuration'] <= 0:
+    if arguments['observationTime'] <= 0 or any(t <= 0 for t in arguments['timeslotDurations']):
         print 'error: the observation time and the duration of the timeslots must be strictly higher than 0!'
         exit(1)
+    if any(t >= arguments['observationTime'] for t in arguments['timeslotDurations']):
+        print 'error: the duration of the timeslots must be lower than the observation time!'
+        exit(1)
+    timeslotsSeconds = [int(round(t * 60 * 60)) for t in arguments['timeslotDurations']]
+    timeslotsLabels = ['%g' % t for t in arguments['timeslotDurations']]
+    if len(set(timeslotsSeconds)) < len(timeslotsSeconds) or len(set(timeslotsLabels)) < len(timeslotsLabels):
+        print 'error: the durations of the timeslots must be distinct (to the second and as printed in the output files)!'
+        exit(1)
+    granularities = range(0, len(arguments['timeslotDurations']))
     # parameter handling -- end
 
     # training phase -- begin
     print 'Start training phase...'
     resLifeInputFeatures = list()
-    routeChangesInputFeatures = list()
+    routeChangesInputFeatures = [list() for granularity in granularities]
     avgRTTInputFeatures = list()
 
     resLifeRealValues = list()
-    routeChangesRealValues = list()
+    routeChangesRealValues = [list() for granularity in granularities]
     avgRTTRealValues = list()
 
     INIT_PATH_OBSERVATION = '../input/observationPaths/'
@@ -42,28 +53,36 @@ if __name__ == '__main__':
     for observationPath in observationPathsList:
         if observationPath in ['.gitignore', 'gitkeep']:
             continue
-        f = fe.getFeatures(INIT_PATH_OBSERVATION, observationPath, arguments['observationTime'], arguments['timeslotDuration'], True)
+        f = fe.getFeatures(INIT_PATH_OBSERVATION, observationPath, arguments['observationTime'], arguments['timeslotDurations'], True)
 
         # store features extracted from this observation path
         resLifeInputFeatures += f[0]
-        routeChangesInputFeatures += f[1]
         avgRTTInputFeatures += f[2]
 
         resLifeRealValues += f[3]
-        routeChangesRealValues += f[4]
         avgRTTRealValues += f[5]
 
+        for granularity in granularities:
+            routeChangesInputFeatures[granularity] += f[1][granularity]
+            routeChangesRealValues[granularity] += f[4][granularity]
+
     N_ESTIMATORS = 10
+    # the trees of a forest are fitted and queried by threads, which all share the training data and the fitted trees of
+    # this process; none of them is pickled or copied
     N_JOBS = 4
     # regressor for reslife prediction
     regressorResLife = sk_ensemble.RandomForestRegressor(n_estimators=N_ESTIMATORS, n_jobs=N_JOBS)
     regressorResLife.fit(resLifeInputFeatures, resLifeRealValues)
     resLifeNBOutputs = regressorResLife.n_outputs_
 
-    # regressor for # route changes in next timeslot prediction
-    regressorRouteChanges = sk_ensemble.RandomForestRegressor(n_estimators=N_ESTIMATORS, n_jobs=N_JOBS)
-    regressorRouteChanges.fit(routeChangesInputFeatures, routeChangesRealValues)
-    routeChangesNBOutputs = regressorRouteChanges.n_outputs_
+    # regressors for # route changes in next timeslot prediction, one per timeslot duration
+    regressorRouteChanges = list()
+    routeChangesNBOutputs = list()
+    for granularity in granularities:
+        regressor = sk_ensemble.RandomForestRegressor(n_estimators=N_ESTIMATORS, n_jobs=N_JOBS)
+        regressor.fit(routeChangesInputFeatures[granularity], routeChangesRealValues[granularity])
+        regressorRouteChanges.append(regressor)
+        routeChangesNBOutputs.append(regressor.n_outputs_)
 
     # regressor for reslife prediction
     regressorAvgRTT = sk_ensemble.RandomForestRegressor(n_estimators=N_ESTIMATORS, n_jobs=N_JOBS)
@@ -84,7 +103,7 @@ if __name__ == '__main__':
         if predictionPath in ['.gitignore', 'gitkeep']:
             continue
         f = fe.getFeatures(INIT_PATH_PREDICTION, predictionPath, arguments['observationTime'],
-                           arguments['timeslotDuration'], False)
+                           arguments['timeslotDurations'], False)
 
         # store features extracted from this prediction path
         resLifeInputFeatures = f[0]
@@ -100,14 +119,16 @@ if __name__ == '__main__':
         else:
             predResLife = math.fabs(regressorResLife.predict(resLifeInputFeatures))
 
-        if routeChangesNBOutputs > 1:
-            predRouteChanges = regressorRouteChanges.predict(routeChangesInputFeatures)[0][0]
-        else:
-            predRouteChanges = regressorRouteChanges.predict(routeChangesInputFeatures)
-        if predRouteChanges < 0:
-            predRouteChanges = 0
-        else:
-            predRouteChanges = round(predRouteChanges)
+        predRouteChanges = list()
+        for granularity in granularities:
+            if routeChangesNBOutputs[granularity] > 1:
+                predRouteChangesInSlot = regressorRouteChanges[granularity].predict(routeChangesInputFeatures[granularity])[0][0]
+            else:
+                predRouteChangesInSlot = regressorRouteChanges[granularity].predict(routeChangesInputFeatures[granularity])
+            if predRouteChangesInSlot < 0:
+                predRouteChanges.append(0)
+            else:
+                predRouteChanges.append(round(predRouteChangesInSlot))
 
         if avgRTTNBOutputs > 1:
             predAvgRTT = regressorAvgRTT.predict(avgRTTInputFeatures)[0][0]
@@ -117,8 +138,9 @@ if __name__ == '__main__':
         # save estimations
         with open('../output/prediction_' + srcIP + '_' + dstIP + '.txt', 'w') as out:
             out.write('RESIDUAL_LIFE_TIME:\t' + str(predResLife) + '\n')
-            out.write('NUMBER_ROUTE_CHANGES_NEXT_' + str(arguments['timeslotDuration']) + 'H_TIMESLOT:\t'
-                      + str(predRouteChanges) + '\n')
+            for granularity in granularities:
+                out.write('NUMBER_ROUTE_CHANGES_NEXT_' + timeslotsLabels[granularity] + 'H_TIMESLOT:\t'
+                          + str(predRouteChanges[granularity]) + '\n')
             out.write('AVG_RTT_NEXT_TRACERT_SAMPLE:\t' + str(predAvgRTT) + '\n')
 
 